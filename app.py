@@ -3,10 +3,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from PIL import Image
 import os, re, win32print, win32api
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
+import threading
+from collections import namedtuple
 import logging
-import unicodedata
+from codificacion_impresora import obtener_tabla, texto_impresora
 
 PRINTER_COMMANDS = {
     'INIT': b'\x1B\x40',           # Inicializar impresora
@@ -38,7 +40,30 @@ DRIVER = 'ODBC Driver 17 for SQL Server'
 USERNAME = os.getenv('SQL_USER', 'sa')
 PASSWORD = os.getenv('SQL_PASSWORD', '1234')
 
-app.config["SQLALCHEMY_DATABASE_URI"] = f"mssql+pyodbc://{USERNAME}:{PASSWORD}@{SERVER}/{DATABASE}?driver={DRIVER}&TrustServerCertificate=yes&charset=utf8"
+# Configuración del archivado de órdenes finalizadas
+ARCHIVO_DIAS = int(os.getenv('ARCHIVO_DIAS', '120'))              # Antigüedad mínima para archivar
+ARCHIVO_LOTE = int(os.getenv('ARCHIVO_LOTE', '500'))              # Órdenes movidas por transacción, 0 desactiva el job
+ARCHIVO_INTERVALO_HORAS = float(os.getenv('ARCHIVO_INTERVALO_HORAS', '24'))  # 0 desactiva el job
+
+# Configuración de la impresora térmica
+IMPRESORA_CODEPAGE = os.getenv('IMPRESORA_CODEPAGE', 'cp858').strip().lower()  # cp850, cp858 o cp1252
+if IMPRESORA_CODEPAGE.isdigit():
+    IMPRESORA_CODEPAGE = f"cp{IMPRESORA_CODEPAGE}"
+IMPRESORA_COLUMNAS = int(os.getenv('IMPRESORA_COLUMNAS', '48'))          # Fuente normal, papel 80 mm
+IMPRESORA_COLUMNAS_PEQUENA = int(os.getenv('IMPRESORA_COLUMNAS_PEQUENA', '64'))  # Fuente pequeña
+REIMPRESION_MAX_LOTE = int(os.getenv('REIMPRESION_MAX_LOTE', '50'))     # Órdenes por llamada a /reprintOrders
+
+# Una configuración inválida debe detener el arranque, no fallar en cada impresión
+obtener_tabla(IMPRESORA_CODEPAGE)
+if IMPRESORA_COLUMNAS < 1:
+    raise ValueError(f"IMPRESORA_COLUMNAS debe ser al menos 1: {IMPRESORA_COLUMNAS}")
+if IMPRESORA_COLUMNAS_PEQUENA < 3:  # La copia del negocio usa 2 columnas de sangría
+    raise ValueError(f"IMPRESORA_COLUMNAS_PEQUENA debe ser al menos 3: {IMPRESORA_COLUMNAS_PEQUENA}")
+
+app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
+    'DATABASE_URL',
+    f"mssql+pyodbc://{USERNAME}:{PASSWORD}@{SERVER}/{DATABASE}?driver={DRIVER}&TrustServerCertificate=yes&charset=utf8"
+)
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 # 3. Inicialización de SQLAlchemy
@@ -71,6 +96,35 @@ class Registro(db.Model):
     finalizada = db.Column(db.Boolean, default=False, nullable=False) 
     medioPago = db.Column(db.String(20), nullable=False, default='efectivo')
 
+    # Índice para que cada lote de archivar_ordenes no recorra toda la tabla
+    __table_args__ = (
+        db.Index('ix_arreglos_finalizada_fechaCreacion', 'finalizada', 'fechaCreacion', mssql_include=['saldo']),
+    )
+
+class RegistroArchivo(db.Model):
+    # Tabla fría: órdenes finalizadas y pagadas que se mueven fuera de 'arreglos'.
+    # Conserva el id original, por eso no es autoincremental.
+    __tablename__ = 'arreglos_archivo'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    nombreCliente = db.Column(db.String(100), nullable=False)
+    fechaEntrega = db.Column(db.DateTime, nullable=False)
+    fechaCreacion = db.Column(db.DateTime, nullable=False)
+    valorTotal = db.Column(db.Numeric(10, 2), nullable=False)
+    abono = db.Column(db.Numeric(10, 2), nullable=False)
+    saldo = db.Column(db.Numeric(10, 2), nullable=False)
+    celular = db.Column(db.String(10), nullable=False)
+    telefono = db.Column(db.String(16), nullable=True)
+    observaciones = db.Column(db.UnicodeText(500), nullable=False)
+    vendedor = db.Column(db.String(50), nullable=False)
+    finalizada = db.Column(db.Boolean, nullable=False)
+    medioPago = db.Column(db.String(20), nullable=False)
+    fechaArchivo = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+# Datos mínimos para imprimir un ticket, sin cargar la entidad ORM completa
+CAMPOS_TICKET = ("id", "nombreCliente", "fechaEntrega", "fechaCreacion", "valorTotal",
+                 "abono", "saldo", "celular", "telefono", "observaciones")
+TicketOrden = namedtuple("TicketOrden", CAMPOS_TICKET)
+
 # 5. Funciones auxiliares
 def validar_datos_numericos(data):
     """Valida los valores numéricos y su relación"""
@@ -124,6 +178,176 @@ def verificar_configuracion_db():
     except Exception as e:
         print(f"Error al verificar configuración DB: {e}")
 
+def crear_indice_archivado():
+    """Crea el índice de archivado en bases existentes (db.create_all no altera tablas ya creadas)"""
+    try:
+        db.session.execute(db.text("""
+            IF NOT EXISTS (
+                SELECT 1 FROM sys.indexes
+                WHERE name = 'ix_arreglos_finalizada_fechaCreacion' AND object_id = OBJECT_ID('arreglos')
+            )
+            CREATE INDEX ix_arreglos_finalizada_fechaCreacion
+                ON arreglos (finalizada, fechaCreacion) INCLUDE (saldo)
+        """))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ No se pudo crear el índice de archivado: {e}")
+
+def obtener_ultimo_id():
+    """Último id usado, considerando también las órdenes archivadas (una sola consulta)"""
+    ultimo_activo, ultimo_archivo = db.session.execute(db.text("""
+        SELECT
+            (SELECT ISNULL(MAX(id), 0) FROM arreglos),
+            (SELECT ISNULL(MAX(id), 0) FROM arreglos_archivo)
+    """)).one()
+    return max(ultimo_activo, ultimo_archivo)
+
+def archivar_ordenes(dias=None, lote=None):
+    """Mueve a 'arreglos_archivo' las órdenes finalizadas, sin saldo y más antiguas que 'dias'.
+
+    Cada lote es un único DELETE ... OUTPUT INTO confirmado en su propia transacción,
+    así los bloqueos duran poco y no se toca el contador de identidad de 'arreglos'.
+    """
+    dias = ARCHIVO_DIAS if dias is None else dias
+    lote = ARCHIVO_LOTE if lote is None else lote
+    if lote <= 0:
+        raise ValueError("El tamaño del lote de archivado debe ser mayor que 0")
+    limite = datetime.utcnow() - timedelta(days=dias)
+    sentencia = db.text("""
+        DELETE TOP (:lote) FROM arreglos WITH (ROWLOCK, READPAST)
+        OUTPUT DELETED.id, DELETED.nombreCliente, DELETED.fechaEntrega, DELETED.fechaCreacion,
+               DELETED.valorTotal, DELETED.abono, DELETED.saldo, DELETED.celular, DELETED.telefono,
+               DELETED.observaciones, DELETED.vendedor, DELETED.finalizada, DELETED.medioPago,
+               GETUTCDATE()
+        INTO arreglos_archivo (id, nombreCliente, fechaEntrega, fechaCreacion,
+               valorTotal, abono, saldo, celular, telefono,
+               observaciones, vendedor, finalizada, medioPago,
+               fechaArchivo)
+        WHERE finalizada = 1 AND saldo = 0 AND fechaCreacion < :limite
+    """)
+
+    total = 0
+    while True:
+        try:
+            movidas = db.session.execute(sentencia, {"lote": lote, "limite": limite}).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        total += movidas
+        if movidas <= 0 or movidas < lote:
+            break
+    return total
+
+def iniciar_archivado_programado():
+    """Ejecuta archivar_ordenes periódicamente en un hilo en segundo plano"""
+    if ARCHIVO_INTERVALO_HORAS <= 0 or ARCHIVO_LOTE <= 0:
+        return None
+
+    def ciclo():
+        while True:
+            try:
+                with app.app_context():
+                    movidas = archivar_ordenes()
+                if movidas:
+                    logger.info(f"Órdenes archivadas: {movidas}")
+            except Exception as e:
+                logger.error(f"Error al archivar órdenes: {e}")
+            time.sleep(ARCHIVO_INTERVALO_HORAS * 3600)
+
+    hilo = threading.Thread(target=ciclo, name="archivado-ordenes", daemon=True)
+    hilo.start()
+    return hilo
+
+def consultar_ordenes(archivo, **filtros):
+    """Consulta órdenes en la tabla activa, en el archivo o en ambas.
+
+    archivo: 'no' (solo activas), 'solo' (solo archivadas) o 'incluir' (ambas).
+    'hasta' es exclusivo: buscar_ordenes lo envía como la medianoche del día siguiente.
+    """
+    modelos = {"no": [Registro], "solo": [RegistroArchivo], "incluir": [Registro, RegistroArchivo]}[archivo]
+    registros = []
+    for modelo in modelos:
+        consulta = modelo.query
+        if filtros.get("nombreCliente"):
+            consulta = consulta.filter(modelo.nombreCliente.ilike(f"%{filtros['nombreCliente']}%"))
+        if filtros.get("celular"):
+            consulta = consulta.filter(modelo.celular == filtros["celular"])
+        if filtros.get("desde"):
+            consulta = consulta.filter(modelo.fechaCreacion >= filtros["desde"])
+        if filtros.get("hasta"):
+            consulta = consulta.filter(modelo.fechaCreacion < filtros["hasta"])
+        registros.extend(consulta.order_by(modelo.fechaCreacion.desc()).all())
+    if len(modelos) > 1:
+        registros.sort(key=lambda r: r.fechaCreacion, reverse=True)
+    return registros
+
+def serializar_registro(registro):
+    """Convierte una orden (activa o archivada) en diccionario para la respuesta JSON"""
+    return {
+        "id": registro.id,
+        "nombreCliente": registro.nombreCliente,
+        "fechaEntrega": registro.fechaEntrega.strftime('%Y-%m-%d %H:%M'),
+        "fechaCreacion": registro.fechaCreacion.strftime('%Y-%m-%d %H:%M'),
+        "valorTotal": float(registro.valorTotal),
+        "abono": float(registro.abono),
+        "saldo": float(registro.saldo),
+        "celular": registro.celular,
+        "telefono": registro.telefono,
+        "observaciones": registro.observaciones,
+        "vendedor": registro.vendedor,
+        "finalizada": registro.finalizada,
+        "archivada": isinstance(registro, RegistroArchivo)
+    }
+
+# Sentencias de ticket construidas una sola vez: una orden (id = ?) o un lote (id IN (...))
+SELECT_TICKET = {
+    modelo: (
+        db.select(*(getattr(modelo, campo) for campo in CAMPOS_TICKET)).where(modelo.id == db.bindparam("id")),
+        db.select(*(getattr(modelo, campo) for campo in CAMPOS_TICKET)).where(
+            modelo.id.in_(db.bindparam("ids", expanding=True))
+        ),
+    )
+    for modelo in (Registro, RegistroArchivo)
+}
+
+def seleccionar_tickets(modelo, ids):
+    """SELECT de solo los campos del ticket; los lotes de más de 1000 ids se parten
+    porque SQL Server admite como máximo 2100 parámetros"""
+    por_id, por_lote = SELECT_TICKET[modelo]
+    if len(ids) == 1:
+        filas = db.session.execute(por_id, {"id": ids[0]})
+        return {fila.id: TicketOrden._make(fila) for fila in filas}
+    tickets = {}
+    for inicio in range(0, len(ids), 1000):
+        filas = db.session.execute(por_lote, {"ids": ids[inicio:inicio + 1000]})
+        tickets.update((fila.id, TicketOrden._make(fila)) for fila in filas)
+    return tickets
+
+def cargar_tickets(ids):
+    """Carga los datos de ticket de varias órdenes, en el orden de 'ids'
+
+    Hace un SELECT sobre 'arreglos' por cada 1000 ids. Los ids que no aparecen
+    ahí se buscan en 'arreglos_archivo' con otra consulta, así se pueden
+    reimprimir las órdenes que lista ?archivo=.
+    """
+    ids = list(dict.fromkeys(ids))
+    tickets = seleccionar_tickets(Registro, ids)
+    faltantes = [id for id in ids if id not in tickets]
+    if faltantes:
+        tickets.update(seleccionar_tickets(RegistroArchivo, faltantes))
+    return [tickets[id] for id in ids if id in tickets]
+
+def cargar_ticket(id):
+    """Carga los datos de ticket de una orden, o None si no existe"""
+    tickets = cargar_tickets([id])
+    return tickets[0] if tickets else None
+
+def ticket_desde_registro(registro):
+    """Construye el ticket a partir de una entidad ya cargada en la sesión"""
+    return TicketOrden._make(getattr(registro, campo) for campo in CAMPOS_TICKET)
+
 def convertir_imagen_a_escpos(ruta_imagen, ancho=384):
     """Convierte una imagen a formato ESC/POS"""
     img = Image.open(ruta_imagen)
@@ -164,7 +388,10 @@ except Exception as e:
     """
 
 def imprimir_registro(registro, solo_negocio=False, cantidad_copias=1):
-    """Imprime tickets ESC/POS directamente en impresora térmica DIG-E200I"""
+    """Imprime tickets ESC/POS directamente en impresora térmica DIG-E200I
+
+    'registro' es un TicketOrden (ver cargar_tickets).
+    """
     
     def enviar_a_impresora(contenido_escpos):
         """Envía comandos ESC/POS directamente a la impresora predeterminada"""
@@ -186,9 +413,19 @@ def imprimir_registro(registro, solo_negocio=False, cantidad_copias=1):
     abono = f"${float(registro.abono):,.0f}".replace(",", ".")
     saldo = f"${float(registro.saldo):,.0f}".replace(",", ".")
 
+    # Textos libres convertidos a la página de código de la impresora
+    codepage = obtener_tabla(IMPRESORA_CODEPAGE).comando.decode('latin-1')
+    nombre_cliente = texto_impresora(registro.nombreCliente, IMPRESORA_CODEPAGE)
+    telefono = texto_impresora(registro.telefono or 'N/A', IMPRESORA_CODEPAGE)
+    observaciones = texto_impresora(registro.observaciones, IMPRESORA_CODEPAGE, IMPRESORA_COLUMNAS)
+    observaciones_negocio = texto_impresora(
+        registro.observaciones, IMPRESORA_CODEPAGE, IMPRESORA_COLUMNAS_PEQUENA - 2
+    ).replace('\n', '\n  ')
+
     # Contenido para el negocio (compacto)
     contenido_negocio = (
         f"{PRINTER_COMMANDS['INIT'].decode('latin-1')}"
+        f"{codepage}"
         f"{PRINTER_COMMANDS['ALIGN_CENTER'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['BOLD_ON'].decode('latin-1')}"
         "====================\n"
@@ -200,10 +437,10 @@ def imprimir_registro(registro, solo_negocio=False, cantidad_copias=1):
         f"{PRINTER_COMMANDS['FONT_SMALL'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['ALIGN_CENTER'].decode('latin-1')}"
         f"ORDEN #:  {registro.id}\n"
-        f"Cliente:  {registro.nombreCliente}\n"
+        f"Cliente:  {nombre_cliente}\n"
         f"Entrega:  {fecha_entrega.split()[0]}  {fecha_entrega.split()[1]}\n"
         f"Celular:  {registro.celular}\n"
-        f"Articulo para:\n  {registro.observaciones}\n"
+        f"Articulo para:\n  {observaciones_negocio}\n"
         f"{PRINTER_COMMANDS['LINE_FEED'].decode('latin-1') * 4}"
         f"{PRINTER_COMMANDS['CUT_PAPER'].decode('latin-1')}"
     )
@@ -211,6 +448,7 @@ def imprimir_registro(registro, solo_negocio=False, cantidad_copias=1):
     # Contenido para el cliente
     contenido_cliente = (
         f"{PRINTER_COMMANDS['INIT'].decode('latin-1')}"
+        f"{codepage}"
         f"{PRINTER_COMMANDS['FONT_LARGE'].decode('latin-1')}" 
         f"{PRINTER_COMMANDS['ALIGN_CENTER'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['BOLD_ON'].decode('latin-1')}"
@@ -231,14 +469,14 @@ def imprimir_registro(registro, solo_negocio=False, cantidad_copias=1):
         f"{PRINTER_COMMANDS['LINE_FEED'].decode('latin-1')}" 
         f"{PRINTER_COMMANDS['BOLD_OFF'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['FONT_NORMAL'].decode('latin-1')}"
-        f"{'Cliente:':<12}{registro.nombreCliente}\n"
+        f"{'Cliente:':<12}{nombre_cliente}\n"
         f"{'Cel:':<12}{registro.celular}\n"
         f"{'Entrega:':<12}{fecha_entrega}\n"
         f"{'Valor:':<12}{valor}\n"
         f"{'Abono:':<12}{abono}\n"
         f"{'Saldo:':<12}{saldo}\n"
-        f"{'Telefono adicional:':<12}{registro.telefono or 'N/A'}\n"
-        f"Articulo para:\n{registro.observaciones}\n"
+        f"{'Telefono adicional:':<12}{telefono}\n"
+        f"Articulo para:\n{observaciones}\n"
         f"\n{PRINTER_COMMANDS['FONT_NORMAL'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['LINE_FEED'].decode('latin-1')}" 
         f"{PRINTER_COMMANDS['BOLD_ON'].decode('latin-1')}"
@@ -267,7 +505,7 @@ def imprimir_registro(registro, solo_negocio=False, cantidad_copias=1):
         raise RuntimeError(f"Error al imprimir: {e}") from e
 
 def imprimir_solo_cliente(registro):
-    """Imprime solo el ticket del cliente"""
+    """Imprime solo el ticket del cliente a partir de un TicketOrden"""
     def enviar_a_impresora(contenido_escpos):
         """Envía comandos ESC/POS directamente a la impresora predeterminada"""
         printer_name = win32print.GetDefaultPrinter()
@@ -288,9 +526,16 @@ def imprimir_solo_cliente(registro):
     abono = f"${float(registro.abono):,.0f}".replace(",", ".")
     saldo = f"${float(registro.saldo):,.0f}".replace(",", ".")
 
+    # Textos libres convertidos a la página de código de la impresora
+    codepage = obtener_tabla(IMPRESORA_CODEPAGE).comando.decode('latin-1')
+    nombre_cliente = texto_impresora(registro.nombreCliente, IMPRESORA_CODEPAGE)
+    telefono = texto_impresora(registro.telefono or 'N/A', IMPRESORA_CODEPAGE)
+    observaciones = texto_impresora(registro.observaciones, IMPRESORA_CODEPAGE, IMPRESORA_COLUMNAS)
+
     # Contenido solo para el cliente
     contenido_cliente = (
         f"{PRINTER_COMMANDS['INIT'].decode('latin-1')}"
+        f"{codepage}"
         f"{PRINTER_COMMANDS['FONT_LARGE'].decode('latin-1')}" 
         f"{PRINTER_COMMANDS['ALIGN_CENTER'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['BOLD_ON'].decode('latin-1')}"
@@ -311,14 +556,14 @@ def imprimir_solo_cliente(registro):
         f"{PRINTER_COMMANDS['LINE_FEED'].decode('latin-1')}" 
         f"{PRINTER_COMMANDS['BOLD_OFF'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['FONT_NORMAL'].decode('latin-1')}"
-        f"{'Cliente:':<12}{registro.nombreCliente}\n"
+        f"{'Cliente:':<12}{nombre_cliente}\n"
         f"{'Cel:':<12}{registro.celular}\n"
         f"{'Entrega:':<12}{fecha_entrega}\n"
         f"{'Valor:':<12}{valor}\n"
         f"{'Abono:':<12}{abono}\n"
         f"{'Saldo:':<12}{saldo}\n"
-        f"{'Telefono adicional:':<12}{registro.telefono or 'N/A'}\n"
-        f"Articulo para:\n{registro.observaciones}\n"
+        f"{'Telefono adicional:':<12}{telefono}\n"
+        f"Articulo para:\n{observaciones}\n"
         f"\n{PRINTER_COMMANDS['FONT_NORMAL'].decode('latin-1')}"
         f"{PRINTER_COMMANDS['LINE_FEED'].decode('latin-1')}" 
         f"{PRINTER_COMMANDS['BOLD_ON'].decode('latin-1')}"
@@ -490,7 +735,7 @@ def recibir_datos():
         return jsonify({"error": "El código del vendedor no es válido"}), 404
 
     try:
-        ultimo_id = db.session.execute(db.text("SELECT ISNULL(MAX(id), 0) FROM arreglos")).scalar()
+        ultimo_id = obtener_ultimo_id()
 
         nuevo_registro = Registro(
             nombreCliente=data["nombreCliente"].strip(),
@@ -527,15 +772,9 @@ def recibir_datos():
         
         # Obtener cantidad de copias (mínimo 1)
         cantidad_copias = max(1, int(data.get("cantidadObjetos", 1)))
-        imprimir_registro(nuevo_registro,solo_negocio=data.get("tieneWhatsapp", False), cantidad_copias=cantidad_copias)
+        imprimir_registro(ticket_desde_registro(nuevo_registro), solo_negocio=data.get("tieneWhatsapp", False), cantidad_copias=cantidad_copias)
         db.session.commit()
         
-        # Verificación final después del commit
-        registro_guardado = Registro.query.get(nuevo_registro.id)
-        #logger.info(f"🔍 Verificación final después del commit:")
-        #logger.info(f"🔍 Observaciones en DB: '{registro_guardado.observaciones}'")
-        #logger.info(f"🔍 Longitud en DB: {len(registro_guardado.observaciones or '')}")
-        
         return jsonify({"message": "Datos guardados correctamente","id": nuevo_registro.id}), 201
     except Exception as e:
         db.session.rollback()
@@ -544,30 +783,60 @@ def recibir_datos():
 
 @app.route("/getOrders", methods=["GET"])
 def obtener_ordenes():
+    # El archivo solo se lee si se pide explícitamente: ?archivo=solo o ?archivo=incluir
+    archivo = request.args.get("archivo", "no")
+    if archivo not in ("no", "solo", "incluir"):
+        return jsonify({"error": "Valor de 'archivo' inválido"}), 400
+
     try:
-        registros = Registro.query.order_by(Registro.fechaCreacion.desc()).all()
-        
-        resultado = [
-            {
-                "id": registro.id,
-                "nombreCliente": registro.nombreCliente,
-                "fechaEntrega": registro.fechaEntrega.strftime('%Y-%m-%d %H:%M'),
-                "fechaCreacion": registro.fechaCreacion.strftime('%Y-%m-%d %H:%M'),
-                "valorTotal": float(registro.valorTotal),
-                "abono": float(registro.abono),
-                "saldo": float(registro.saldo),
-                "celular": registro.celular,
-                "telefono": registro.telefono,
-                "observaciones": registro.observaciones,
-                "vendedor": registro.vendedor,
-                "finalizada": registro.finalizada 
-            }
-            for registro in registros
-        ]
+        registros = consultar_ordenes(archivo)
+        resultado = [serializar_registro(registro) for registro in registros]
         return jsonify(resultado), 200
     except Exception as e:
         return jsonify({"error": f"Error al obtener las órdenes: {str(e)}"}), 500
 
+@app.route("/searchOrders", methods=["GET"])
+def buscar_ordenes():
+    archivo = request.args.get("archivo", "no")
+    if archivo not in ("no", "solo", "incluir"):
+        return jsonify({"error": "Valor de 'archivo' inválido"}), 400
+
+    try:
+        filtros = {
+            "nombreCliente": request.args.get("nombreCliente", "").strip(),
+            "celular": request.args.get("celular", "").strip(),
+            "desde": datetime.strptime(request.args["desde"], "%Y-%m-%d") if request.args.get("desde") else None,
+            "hasta": datetime.strptime(request.args["hasta"], "%Y-%m-%d") + timedelta(days=1) if request.args.get("hasta") else None,
+        }
+    except ValueError:
+        return jsonify({"error": "Las fechas deben tener formato YYYY-MM-DD"}), 400
+
+    try:
+        registros = consultar_ordenes(archivo, **filtros)
+        return jsonify([serializar_registro(registro) for registro in registros]), 200
+    except Exception as e:
+        return jsonify({"error": f"Error al buscar las órdenes: {str(e)}"}), 500
+
+@app.route("/archiveOrders", methods=["POST"])
+def archivar_ordenes_manual():
+    # ARCHIVO_LOTE <= 0 desactiva el archivado: es configuración del servidor, no un error del cliente
+    if ARCHIVO_LOTE <= 0:
+        return jsonify({"error": "El archivado de órdenes está desactivado (ARCHIVO_LOTE)"}), 503
+
+    data = request.get_json(silent=True) or {}
+    try:
+        dias = int(data.get("dias", ARCHIVO_DIAS))
+    except (TypeError, ValueError):
+        return jsonify({"error": "El valor de 'dias' es inválido"}), 400
+    if dias < 0:
+        return jsonify({"error": "Los días no pueden ser negativos"}), 400
+
+    try:
+        movidas = archivar_ordenes(dias=dias)
+        return jsonify({"message": "Órdenes archivadas correctamente", "archivadas": movidas}), 200
+    except Exception as e:
+        return jsonify({"error": f"Error al archivar las órdenes: {str(e)}"}), 500
+
 @app.route("/deleteOrder/<int:id>", methods=["DELETE"])
 def eliminar_orden(id):
     try:
@@ -633,35 +902,83 @@ def actualizar_orden(id):
         db.session.rollback()
         return jsonify({"error": f"Error al actualizar la orden: {str(e)}"}), 500
 
+def reimprimir_ticket(ticket, reprint_type):
+    """Imprime un ticket según el tipo de reimpresión ("1", "2" o "3") y devuelve el mensaje"""
+    if reprint_type == "1":  # Cliente y Negocio
+        imprimir_registro(ticket, solo_negocio=False, cantidad_copias=1)
+        return "Reimpresas: copia del cliente y copia del negocio"
+    if reprint_type == "2":  # Solo Cliente
+        imprimir_solo_cliente(ticket)
+        return "Reimpresa: solo copia del cliente"
+    if reprint_type == "3":  # Solo Negocio
+        imprimir_registro(ticket, solo_negocio=True, cantidad_copias=1)
+        return "Reimpresa: solo copia del negocio"
+
 @app.route("/reprintOrder/<int:id>", methods=["POST"])
 def reimprimir_orden(id):
     data = request.json
     reprint_type = data.get("reprintType", "1")
+    if reprint_type not in ("1", "2", "3"):
+        return jsonify({"error": "Tipo de reimpresión inválido"}), 400
     
     try:
-        # Buscar la orden en la base de datos
-        registro = Registro.query.get(id)
-        if not registro:
+        # Buscar solo los datos del ticket en la base de datos
+        ticket = cargar_ticket(id)
+        if not ticket:
             return jsonify({"error": "Orden no encontrada"}), 404
 
-        # Determinar qué imprimir según el tipo
-        if reprint_type == "1":  # Cliente y Negocio
-            imprimir_registro(registro, solo_negocio=False, cantidad_copias=1)
-            message = "Reimpresas: copia del cliente y copia del negocio"
-        elif reprint_type == "2":  # Solo Cliente
-            imprimir_solo_cliente(registro)
-            message = "Reimpresa: solo copia del cliente"
-        elif reprint_type == "3":  # Solo Negocio
-            imprimir_registro(registro, solo_negocio=True, cantidad_copias=1)
-            message = "Reimpresa: solo copia del negocio"
-        else:
-            return jsonify({"error": "Tipo de reimpresión inválido"}), 400
-
+        message = reimprimir_ticket(ticket, reprint_type)
         return jsonify({"message": message}), 200
         
     except Exception as e:
         return jsonify({"error": f"Error al reimprimir la orden: {str(e)}"}), 500
 
+@app.route("/reprintOrders", methods=["POST"])
+def reimprimir_ordenes():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("ids"), list) or not data["ids"]:
+        return jsonify({"error": "Faltan los ids de las órdenes"}), 400
+    if len(data["ids"]) > REIMPRESION_MAX_LOTE:
+        return jsonify({"error": f"No se pueden reimprimir más de {REIMPRESION_MAX_LOTE} órdenes a la vez"}), 400
+    reprint_type = data.get("reprintType", "1")
+    if reprint_type not in ("1", "2", "3"):
+        return jsonify({"error": "Tipo de reimpresión inválido"}), 400
+
+    # Solo enteros reales o textos de dígitos: int() truncaría 1.9 y convertiría true en 1
+    if not all(
+        (isinstance(id, int) and not isinstance(id, bool)) or (isinstance(id, str) and id.isascii() and id.isdigit())
+        for id in data["ids"]
+    ):
+        return jsonify({"error": "Los ids de las órdenes son inválidos"}), 400
+    ids = [int(id) for id in data["ids"]]
+
+    try:
+        # Un SELECT para todo el lote (más el archivo si faltan ids)
+        tickets = cargar_tickets(ids)
+    except Exception as e:
+        return jsonify({"error": f"Error al reimprimir las órdenes: {str(e)}"}), 500
+
+    # Un error de impresión no detiene el lote: se registra y se sigue con la siguiente orden
+    encontrados = {ticket.id for ticket in tickets}
+    impresas = []
+    fallidas = []
+    for i, ticket in enumerate(tickets):
+        try:
+            reimprimir_ticket(ticket, reprint_type)
+            impresas.append(ticket.id)
+        except Exception as e:
+            logger.error(f"Error al reimprimir la orden {ticket.id}: {e}")
+            fallidas.append({"id": ticket.id, "error": str(e)})
+        if i < len(tickets) - 1:  # No esperar después de la última impresión
+            time.sleep(0.5)
+
+    return jsonify({
+        "message": f"Órdenes reimpresas: {len(impresas)}",
+        "impresas": impresas,
+        "fallidas": fallidas,
+        "noEncontradas": [id for id in dict.fromkeys(ids) if id not in encontrados]
+    }), 200
+
 # 7. Inicialización de la base de datos
 with app.app_context():
     try:
@@ -673,6 +990,7 @@ with app.app_context():
         
         # Verificar configuración
         verificar_configuracion_db()
+        crear_indice_archivado()
         
         admin_empleado = Empleado.query.filter_by(codigo="ADMIN").first()
         if not admin_empleado:
@@ -705,4 +1023,5 @@ with app.app_context():
 
 # 8. Punto de entrada de la aplicación
 if __name__ == "__main__":
+    iniciar_archivado_programado()
     app.run(host="0.0.0.0", port=8080, debug=False)
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""Benchmark de la conversión y ajuste de observaciones para la impresora.
+
+Uso: python benchmarks/bench_codificacion.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codificacion_impresora import CODEPAGES, obtener_tabla, texto_impresora
+
+FRASE = "Cambiar cremallera del bolso café, coser “asa” rota — urgente 👜 €20 … "
+REPETICIONES = 2000
+
+
+def nota(longitud):
+    return (FRASE * (longitud // len(FRASE) + 1))[:longitud]
+
+
+def main():
+    for codec in CODEPAGES:
+        obtener_tabla(codec)  # La tabla se construye una sola vez, fuera de la medición
+        texto_impresora(FRASE, codec)  # Y los caracteres de respaldo quedan en caché
+
+    print(f"{'codepage':<10}{'longitud':>10}{'us/nota':>12}{'ns/carácter':>14}")
+    for codec in CODEPAGES:
+        for longitud in (500, 5000, 50000):
+            texto = nota(longitud)
+            repeticiones = max(1, REPETICIONES * 500 // longitud)
+            segundos = timeit.timeit(lambda: texto_impresora(texto, codec, 48), number=repeticiones)
+            por_nota = segundos / repeticiones
+            print(f"{codec:<10}{longitud:>10}{por_nota * 1e6:>12.1f}{por_nota * 1e9 / longitud:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark de la carga de datos para imprimir tickets.
+
+Compara la carga de la entidad completa (Registro.query.get) con la carga de
+solo los campos del ticket (cargar_ticket / cargar_tickets). Cuenta las
+sentencias SQL enviadas y mide con tracemalloc el pico de memoria asignada
+durante la carga y lo que queda vivo en el resultado, por orden.
+
+Corre sobre SQLite en memoria y con win32print simulado, así que sirve para
+comparar los dos caminos, no para medir la latencia real de SQL Server.
+
+Uso: python benchmarks/bench_tickets.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+import types
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["ARCHIVO_INTERVALO_HORAS"] = "0"
+
+# Impresora simulada: se descartan los bytes del ticket
+win32print = types.ModuleType("win32print")
+win32print.GetDefaultPrinter = lambda: "Simulada"
+win32print.OpenPrinter = lambda nombre: object()
+win32print.StartDocPrinter = lambda *args: 1
+win32print.StartPagePrinter = lambda *args: None
+win32print.WritePrinter = lambda *args: None
+win32print.EndPagePrinter = lambda *args: None
+win32print.EndDocPrinter = lambda *args: None
+win32print.ClosePrinter = lambda *args: None
+sys.modules["win32print"] = win32print
+sys.modules["win32api"] = types.ModuleType("win32api")
+
+import app as api  # noqa: E402
+
+ORDENES = 200
+LOTE = 100
+OBSERVACIONES = "Cambiar cremallera del bolso café y coser el asa rota, entregar con bolsa " * 6
+
+
+def preparar():
+    with api.app.app_context():
+        api.db.session.add_all(
+            api.Registro(
+                nombreCliente=f"Cliente {i}",
+                fechaEntrega=datetime(2026, 1, 1, 10, 0),
+                valorTotal=50000, abono=20000, saldo=30000,
+                celular="3001234567", telefono=None,
+                observaciones=OBSERVACIONES[:500],
+                vendedor="ADMIN", medioPago="efectivo",
+            )
+            for i in range(ORDENES)
+        )
+        api.db.session.commit()
+        return [id for (id,) in api.db.session.execute(api.db.select(api.Registro.id))]
+
+
+def medir(nombre, funcion, elementos, ordenes_por_llamada=1):
+    """Ejecuta 'funcion' por cada id (o lote) en una sesión nueva, como una petición HTTP.
+
+    Reporta por orden: sentencias SQL, pico de memoria asignada durante la
+    llamada, memoria que sigue viva en el resultado y tiempo.
+    """
+    sentencias = []
+    escuchar = lambda *args, **kwargs: sentencias.append(1)
+    with api.app.app_context():
+        for elemento in elementos[:2]:  # Calentar la caché de sentencias de SQLAlchemy
+            funcion(elemento)
+            api.db.session.remove()
+
+        api.db.event.listen(api.db.engine, "before_cursor_execute", escuchar)
+        picos = retenidos = segundos = 0
+        try:
+            tracemalloc.start()
+            for elemento in elementos:
+                api.db.session.remove()
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                inicio = time.perf_counter()
+                resultado = funcion(elemento)
+                segundos += time.perf_counter() - inicio
+                actual, pico = tracemalloc.get_traced_memory()
+                picos += pico - base
+                retenidos += actual - base
+                del resultado
+            tracemalloc.stop()
+        finally:
+            api.db.event.remove(api.db.engine, "before_cursor_execute", escuchar)
+            api.db.session.remove()
+
+    ordenes = len(elementos) * ordenes_por_llamada
+    print(f"{nombre:<38}{len(sentencias) / ordenes:>8.2f}{picos / ordenes:>12.0f}"
+          f"{retenidos / ordenes:>12.0f}{segundos / ordenes * 1e6:>10.1f}")
+
+
+def main():
+    ids = preparar()
+    lotes = [ids[i:i + LOTE] for i in range(0, len(ids), LOTE)]
+
+    def get_completo(id):
+        return api.db.session.get(api.Registro, id)
+
+    def get_por_lote(lote):
+        return [api.db.session.get(api.Registro, id) for id in lote]
+
+    def imprimir_antes(id):
+        registro = api.db.session.get(api.Registro, id)
+        api.imprimir_registro(registro, solo_negocio=True)
+        return registro
+
+    def imprimir_despues(id):
+        ticket = api.cargar_ticket(id)
+        api.imprimir_registro(ticket, solo_negocio=True)
+        return ticket
+
+    print(f"{'por orden':<38}{'SQL':>8}{'pico B':>12}{'retenido B':>12}{'us':>10}")
+    medir("antes: Registro.query.get", get_completo, ids)
+    medir("despues: cargar_ticket", api.cargar_ticket, ids)
+    medir(f"antes: {LOTE} x Registro.query.get", get_por_lote, lotes, LOTE)
+    medir(f"despues: cargar_tickets({LOTE} ids)", api.cargar_tickets, lotes, LOTE)
+    medir("antes: get + imprimir_registro", imprimir_antes, ids)
+    medir("despues: cargar_ticket + imprimir", imprimir_despues, ids)
+
+
+if __name__ == "__main__":
+    main()
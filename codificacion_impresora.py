@@ -0,0 +1,123 @@
+import unicodedata
+
+# Páginas de código soportadas: códec de Python -> n del comando ESC t n
+CODEPAGES = {
+    'cp850': 2,     # PC850 Multilingüe
+    'cp858': 19,    # PC858 (PC850 con €)
+    'cp1252': 16,   # WPC1252
+}
+
+# Sustituciones para caracteres frecuentes que no existen en las páginas de código
+# (teclados de celular, copiar/pegar de WhatsApp, etc.)
+REEMPLAZOS = {
+    '‘': "'", '’': "'", '‚': "'", '′': "'",
+    '“': '"', '”': '"', '„': '"', '″': '"',
+    '–': '-', '—': '-', '‒': '-', '−': '-',
+    '…': '...', '•': '*', '·': '.',
+    '€': 'EUR',
+    ' ': ' ', ' ': ' ', ' ': ' ', ' ': ' ',
+    '\t': ' ', '\r': '',
+}
+
+
+class TablaCodepage(dict):
+    """Tabla para str.translate que convierte texto Unicode a los bytes de una página de código.
+
+    Cada carácter se traduce a una cadena cuyos code points son los bytes finales,
+    así el resultado se pasa a bytes con encode('latin-1'). Los caracteres que no
+    están en la tabla se resuelven la primera vez que aparecen y quedan en caché.
+    """
+
+    def __init__(self, codec):
+        super().__init__()
+        self.codec = codec
+        self.comando = b'\x1B\x74' + bytes([CODEPAGES[codec]])
+        for byte in range(256):
+            try:
+                caracter = bytes([byte]).decode(codec)
+            except UnicodeDecodeError:
+                continue
+            self.setdefault(ord(caracter), chr(byte))
+        # Los caracteres de control del texto libre (ESC, GS, ...) se descartan para que no
+        # se interpreten como comandos; los saltos de línea los maneja ajustar_lineas
+        for codigo in [*range(0x20), 0x7F]:
+            if codigo != ord('\n'):
+                self[codigo] = ''
+        for caracter, reemplazo in REEMPLAZOS.items():
+            if ord(caracter) not in self or caracter.isspace():
+                self[ord(caracter)] = ''.join(self[ord(c)] for c in reemplazo)
+
+    def __missing__(self, codigo):
+        caracter = chr(codigo)
+        categoria = unicodedata.category(caracter)
+        if categoria in ('Mn', 'Cf'):
+            # Marcas combinantes sueltas, selectores de variación, ZWJ de emojis
+            resultado = ''
+        else:
+            # Precompone primero (e + ´ -> é) y, si no existe, cae a la letra base
+            compuesto = unicodedata.normalize('NFC', caracter)
+            if len(compuesto) == 1 and ord(compuesto) in self and ord(compuesto) != codigo:
+                resultado = self[ord(compuesto)]
+            else:
+                base = ''.join(
+                    c for c in unicodedata.normalize('NFKD', caracter)
+                    if unicodedata.category(c) != 'Mn'
+                )
+                if base and base != caracter and all(ord(c) in self for c in base):
+                    resultado = ''.join(self[ord(c)] for c in base)
+                else:
+                    resultado = '?'
+        self[codigo] = resultado
+        return resultado
+
+
+_TABLAS = {}
+
+def obtener_tabla(codec):
+    """Devuelve la tabla de la página de código, construyéndola solo la primera vez"""
+    if codec not in CODEPAGES:
+        raise ValueError(f"Página de código no soportada: {codec}")
+    if codec not in _TABLAS:
+        _TABLAS[codec] = TablaCodepage(codec)
+    return _TABLAS[codec]
+
+def texto_impresora(texto, codec, columnas=None):
+    """Convierte texto a la página de código y, si se indica, lo ajusta a 'columnas'.
+
+    El resultado ya está en la forma que espera enviar_a_impresora: cada carácter
+    es un byte de la página de código y se pasa a bytes con encode('latin-1').
+    """
+    texto = unicodedata.normalize('NFC', str(texto or '')).translate(obtener_tabla(codec))
+    if columnas is None:
+        return texto
+    return '\n'.join(ajustar_lineas(texto, columnas))
+
+def ajustar_lineas(texto, columnas):
+    """Ajusta el texto por palabras al ancho del papel en una sola pasada.
+
+    Respeta los saltos de línea existentes y corta las palabras más largas que
+    una línea completa.
+    """
+    if columnas < 1:
+        raise ValueError(f"El ancho de línea debe ser al menos 1 columna: {columnas}")
+    lineas = []
+    for parrafo in texto.split('\n'):
+        actual = ''
+        # Solo se separa por ' ': en la forma de bytes hay letras (p. ej. 'à' = 0x85
+        # en CP850) que str.split() consideraría espacios
+        for palabra in filter(None, parrafo.split(' ')):
+            while len(palabra) > columnas:
+                if actual:
+                    lineas.append(actual)
+                    actual = ''
+                lineas.append(palabra[:columnas])
+                palabra = palabra[columnas:]
+            if not actual:
+                actual = palabra
+            elif len(actual) + 1 + len(palabra) <= columnas:
+                actual += ' ' + palabra
+            else:
+                lineas.append(actual)
+                actual = palabra
+        lineas.append(actual)
+    return lineas